@@ -26,6 +26,8 @@ CONFIGS = [
     {"w": 20, "h": 15, "nr": 5, "nt": 10, "algo": "fifo",    "label": "Larger Grid"},
     {"w": 10, "h": 8,  "nr": 3, "nt": 8,  "algo": "nearest", "label": "Nearest Algo"},
     {"w": 12, "h": 10, "nr": 4, "nt": 6,  "algo": "fifo",    "label": "Shelf Density Test"},
+    {"w": 12, "h": 10, "nr": 15, "nt": 100, "algo": "nearest", "label": "High Density", "steps": 1000},
+    {"w": 12, "h": 10, "nr": 15, "nt": 100, "algo": "nearest", "label": "High Density Congestion", "steps": 1000, "congestion": True},
 ]
 
 def ci95(data):
@@ -49,6 +51,8 @@ for cfg_idx, cfg in enumerate(CONFIGS, start=1):
         manager.nrobots = cfg["nr"]
         manager.ntasks = cfg["nt"]
         manager.algo = cfg["algo"]
+        manager.congestion = cfg.get("congestion", False)
+        manager.steps = cfg.get("steps", 200)
         run_id = cfg_idx * 10_000 + r
         csv_file, json_file = manager.run_single(run_id=run_id)
         with open(json_file) as f:
@@ -82,6 +86,9 @@ for cfg_idx, cfg in enumerate(CONFIGS, start=1):
             "steps": summary.get("steps", 0),
             "mean_util_frac": mean_util,
             "approx_remaining_tasks": approx_remaining,
+            "congestion": summary.get("congestion", False),
+            "throughput": summary.get("throughput", 0.0),
+            "mean_wait_steps": summary.get("mean_wait_steps", 0.0),
             "csv_file": csv_file,
             "json_file": json_file
         })
@@ -100,7 +107,9 @@ for scenario, group in df.groupby("scenario"):
     summary_stats[scenario] = {
         "duration": ci95(durations),
         "steps": ci95(steps),
-        "util": ci95(utils)
+        "util": ci95(utils),
+        "throughput": ci95(group["throughput"].tolist()),
+        "wait": ci95(group["mean_wait_steps"].tolist())
     }
 with open(OUTPUT_DIR / "stats_summary.json", "w") as f:
     json.dump(summary_stats, f, indent=2)
@@ -165,4 +174,16 @@ plt.tight_layout()
 plt.savefig(OUTPUT_DIR / "util_by_scenario.png")
 plt.close()
 
+plt.figure(figsize=(8,4))
+for scenario in order:
+    g = df[df["scenario"] == scenario]
+    plt.plot(g["run"], g["mean_wait_steps"], "o-", alpha=0.6, label=scenario)
+plt.title("Mean robot wait steps by scenario")
+plt.xlabel("run index")
+plt.ylabel("mean wait steps")
+plt.legend()
+plt.tight_layout()
+plt.savefig(OUTPUT_DIR / "wait_by_scenario.png")
+plt.close()
+
 print("Saved plots in:", OUTPUT_DIR)
\ No newline at end of file
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import random
+import time
+from typing import Dict, Optional
+
+async def _read_reply(reader: asyncio.StreamReader) -> Dict:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError('fleet server closed the connection')
+    return json.loads(line)
+
+async def run_load_test(host: str = '127.0.0.1', port: int = 8765, rate: float = 20.0,
+                        duration: float = 10.0, seed: Optional[int] = None) -> Dict:
+    """
+    Submit tasks to a running FleetServer with Poisson arrivals at `rate` per second,
+    while a second connection subscribes to the position stream. Returns the server's
+    stats plus client-side counts once `duration` seconds have elapsed.
+    """
+    rng = random.Random(seed)
+    sub_reader, sub_writer = await asyncio.open_connection(host, port)
+    sub_writer.write(b'{"op": "subscribe"}\n')
+    await sub_writer.drain()
+    snapshot = await _read_reply(sub_reader)
+    events = 0
+
+    async def consume():
+        nonlocal events
+        while True:
+            line = await sub_reader.readline()
+            if not line:
+                return
+            events += 1
+
+    consumer = asyncio.create_task(consume())
+    reader, writer = await asyncio.open_connection(host, port)
+    submitted = 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        writer.write(json.dumps({'op': 'submit'}).encode() + b'\n')
+        submitted += 1
+        await writer.drain()
+        await asyncio.sleep(rng.expovariate(rate))
+    acks = 0
+    errors = 0
+    while acks + errors < submitted:
+        reply = await _read_reply(reader)
+        if reply.get('ok'):
+            acks += 1
+        else:
+            errors += 1
+    writer.write(b'{"op": "stats"}\n')
+    await writer.drain()
+    stats = await _read_reply(reader)
+    consumer.cancel()
+    writer.close()
+    sub_writer.close()
+    stats.update({'client_submitted': submitted, 'client_acks': acks, 'client_errors': errors,
+                  'stream_events': events, 'nrobots': len(snapshot['robots'])})
+    return stats
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Load-test a running fleet server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--rate', type=float, default=20.0, help='task submissions per second')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds')
+    args = parser.parse_args()
+    try:
+        result = asyncio.run(run_load_test(args.host, args.port, args.rate, args.duration))
+    except ConnectionError as e:
+        raise SystemExit(f"Load test failed: {e}")
+    for name in ('submit_to_assign', 'tick_compute'):
+        h = result[name]
+        print(f"{name:<17} n={h['count']:<6} mean={h['mean_ms']}ms p50={h['p50_ms']}ms "
+              f"p90={h['p90_ms']}ms p99={h['p99_ms']}ms max={h['max_ms']}ms")
+    print(f"ticks={result['tick']} overruns={result['overruns']} completed={result['completed_tasks']} "
+          f"unassigned={result['unassigned']} submitted={result['client_submitted']} "
+          f"stream_events={result['stream_events']}")
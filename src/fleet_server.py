@@ -0,0 +1,361 @@
+import asyncio
+import bisect
+import json
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Optional
+from warehouse import Warehouse
+from scheduler import fifo_allocate, nearest_allocate
+from traffic import TrafficMap
+from pathfinding import multi_source_nearest, neighbors
+
+Position = Tuple[int, int]
+
+log = logging.getLogger(__name__)
+
+# Bucket upper bounds in milliseconds; the last bucket catches everything above.
+LATENCY_BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate percentiles."""
+    def __init__(self, bounds_ms: List[float] = LATENCY_BUCKETS_MS):
+        self.bounds_ms = list(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float):
+        ms = seconds * 1000.0
+        self.counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (max if in the overflow bucket)."""
+        if self.total == 0:
+            return 0.0
+        rank = q / 100.0 * self.total
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return min(self.bounds_ms[i], self.max_ms) if i < len(self.bounds_ms) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.total,
+            'mean_ms': round(self.sum_ms / self.total, 3) if self.total else 0.0,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max_ms, 3),
+            'buckets_ms': self.bounds_ms,
+            'counts': self.counts
+        }
+
+
+class FleetServer:
+    """
+    Asyncio server that drives the simulation in real time.
+    Clients connect over a local TCP socket and exchange newline-delimited JSON:
+      {"op": "submit", "pickup": [x, y], "dropoff": [x, y]}  -> {"ok": true, "task_id": n}
+      {"op": "order", "items": {"itemA": 2}}                   -> {"ok": true, "order_id": n, "task_ids": [...]}
+      {"op": "subscribe"}                                      -> snapshot, then {"event": "tick", ...} deltas
+      {"op": "stats"}                                          -> latency histograms and counters
+    Allocation, planning and robot steps run in a single worker thread, so slow A* calls
+    never block the I/O loop. Submissions are queued and handed to the worker at the next tick;
+    their replies are sent once accepted, so a client may pipeline many submissions.
+    tick_rate is in ticks per second; 0 runs ticks as fast as possible.
+    """
+    def __init__(self, width: int = 18, height: int = 15, nrobots: int = 5, nshelves: int = 15,
+                 algo: str = 'nearest', seed: int = 42, tick_rate: float = 10.0,
+                 congestion: bool = False, host: str = '127.0.0.1', port: int = 8765):
+        self.width = width
+        self.height = height
+        self.algo = algo
+        self.tick_rate = tick_rate
+        self.host = host
+        self.port = port
+        random.seed(seed)
+        self.warehouse = Warehouse(width, height, seed=seed)
+        self.warehouse.seed_shelves(nshelves)
+        self.robots = self.warehouse.place_random_robots(nrobots)
+        self._reachable = self._reachable_cells()
+        self._pickups = [s.pos for s in self.warehouse.shelves.values() if self._can_pick(s.pos)]
+        # Default dropoff is the far corner, or the nearest reachable cell if shelves cover it.
+        corner = (width - 1, height - 1)
+        self.dropoff = min(self._reachable or {corner}, key=lambda c: (abs(c[0] - corner[0]) + abs(c[1] - corner[1]), c))
+        self.traffic = TrafficMap(width, height) if congestion else None
+        self.tick = 0
+        self.overruns = 0
+        self.completed_tasks = 0
+        self.submit_to_assign = LatencyHistogram()
+        self.tick_compute = LatencyHistogram()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fleet-tick')
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._submitted_at: Dict[int, float] = {}
+        self._last_pos: Dict[int, Position] = {}
+        self._subscribers: List[asyncio.Queue] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._running = False
+        self._robots_view = self._snapshot()
+        self._unassigned = 0
+
+    def _reachable_cells(self) -> set:
+        """Free cells some robot can drive to; shelves are fixed once the server starts."""
+        shelves = [s.pos for s in self.warehouse.shelves.values()]
+        free = [(x, y) for x in range(self.width) for y in range(self.height) if (x, y) not in set(shelves)]
+        _, came_from = multi_source_nearest([r.pos for r in self.robots], free, self.width, self.height,
+                                            shelves, k=len(free))
+        return set(came_from)
+
+    def _can_pick(self, pos: Position) -> bool:
+        return pos in self._reachable or any(n in self._reachable for n in neighbors(pos, self.width, self.height))
+
+    async def serve(self):
+        """Start the socket server and run the tick loop until stop() is called."""
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._running = True
+        try:
+            await self._tick_loop()
+        finally:
+            self._server.close()
+            await self._server.wait_closed()
+            self._executor.shutdown(wait=True)
+
+    def stop(self):
+        self._running = False
+
+    async def _tick_loop(self):
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.tick_rate if self.tick_rate > 0 else 0.0
+        next_tick = time.perf_counter()
+        while self._running:
+            pending, self._pending = self._pending, []
+            # Phase one: accept submissions and reply before any allocation work can fail.
+            if pending:
+                accepted = await loop.run_in_executor(
+                    self._executor, self._accept_batch, [spec for spec, _ in pending])
+                for (_, fut), reply in zip(pending, accepted):
+                    if not fut.done():
+                        fut.set_result(reply)
+            # Phase two: allocate and step; a failure here skips the tick but keeps serving.
+            try:
+                assigned, deltas, compute_s = await loop.run_in_executor(self._executor, self._run_tick)
+            except Exception:
+                log.exception('tick %d failed', self.tick)
+                assigned, deltas, compute_s = [], [], 0.0
+            now = time.perf_counter()
+            for _, task_id in assigned:
+                submitted = self._submitted_at.pop(task_id, None)
+                if submitted is not None:
+                    self.submit_to_assign.record(now - submitted)
+            self.tick_compute.record(compute_s)
+            self._publish({'event': 'tick', 'tick': self.tick, 'robots': deltas,
+                           'assigned': [list(a) for a in assigned]})
+            self.tick += 1
+            if period:
+                next_tick += period
+                delay = next_tick - time.perf_counter()
+                if delay < 0:
+                    self.overruns += 1
+                    next_tick = time.perf_counter()
+                    delay = 0
+                await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)
+
+    def _accept_batch(self, specs: List[Dict]) -> List[Dict]:
+        """Worker-thread body: add queued submissions, each in isolation."""
+        accepted = []
+        for spec in specs:
+            try:
+                accepted.append(self._accept(spec))
+            except Exception as e:
+                log.exception('rejected submission %r', spec)
+                accepted.append({'ok': False, 'error': f'internal error: {e}'})
+        self._unassigned = len(self.warehouse.tasks)
+        return accepted
+
+    def _run_tick(self):
+        """
+        Worker-thread body: allocate, step robots and diff positions.
+        Ends by storing the robot snapshot and counters that the I/O handlers read.
+        """
+        start = time.perf_counter()
+        alloc = fifo_allocate if self.algo == 'fifo' else nearest_allocate
+        assigned = alloc(self.warehouse, self.robots, self.width, self.height, self.traffic)
+        reserved_positions = set()
+        moves = []
+        for r in sorted(self.robots, key=lambda r: r.id):
+            prev_pos = r.pos
+            r.step(occupied_next_positions=reserved_positions)
+            if r.state in ('to_pickup', 'to_dropoff') and r.pos:
+                reserved_positions.add(r.pos)
+            if r.pos != prev_pos:
+                moves.append(r.pos)
+        if self.traffic is not None:
+            self.traffic.update([r.pos for r in self.robots if r.state != 'idle'], moves)
+        self.completed_tasks = sum(r.completed_tasks for r in self.robots)
+        deltas = []
+        for r in self.robots:
+            if self._last_pos.get(r.id) != r.pos:
+                self._last_pos[r.id] = r.pos
+                deltas.append({'id': r.id, 'pos': list(r.pos), 'state': r.state})
+        self._robots_view = self._snapshot()
+        self._unassigned = len(self.warehouse.tasks)
+        return assigned, deltas, time.perf_counter() - start
+
+    def _accept(self, spec: Dict) -> Dict:
+        submitted = spec['submitted_at']
+        try:
+            if spec['op'] == 'order':
+                items = spec['items']
+                if not isinstance(items, dict) or not all(
+                        isinstance(k, str) and type(v) is int and v > 0 for k, v in items.items()):
+                    raise ValueError('items must map item names to positive integer quantities')
+                oid = self.warehouse.add_order(items, self._dropoff(spec.get('dropoff')))
+                task_ids = [t.id for t in self.warehouse.tasks if t.order_id == oid]
+                for tid in task_ids:
+                    self._submitted_at[tid] = submitted
+                return {'ok': True, 'order_id': oid, 'task_ids': task_ids}
+            pickup = self._position(spec.get('pickup'), None)
+            if pickup is None:
+                if not self._pickups:
+                    raise ValueError('no shelf is reachable for a default pickup')
+                pickup = random.choice(self._pickups)
+            elif not self._can_pick(pickup):
+                raise ValueError(f'pickup {pickup} cannot be reached by any robot')
+            dropoff = self._dropoff(spec.get('dropoff'))
+            tid = self.warehouse.add_task(order_id=None, shelf_id=None, item=spec.get('item'), qty=1,
+                                          pickup=pickup, dropoff=dropoff)
+            self._submitted_at[tid] = submitted
+            return {'ok': True, 'task_id': tid}
+        except (KeyError, TypeError, ValueError) as e:
+            return {'ok': False, 'error': str(e)}
+
+    def _position(self, value, default: Optional[Position]) -> Optional[Position]:
+        if value is None:
+            return default
+        if not (isinstance(value, (list, tuple)) and len(value) == 2
+                and all(type(v) is int for v in value)):
+            raise ValueError(f'position must be [x, y] integers, got {value!r}')
+        x, y = value
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise ValueError(f'position {(x, y)} outside {self.width}x{self.height} grid')
+        return (x, y)
+
+    def _dropoff(self, value) -> Position:
+        """Validate a dropoff: it must be a free cell that robots can drive to."""
+        dropoff = self._position(value, self.dropoff)
+        if dropoff not in self._reachable:
+            raise ValueError(f'dropoff {dropoff} is a shelf or cannot be reached by any robot')
+        return dropoff
+
+    def _publish(self, event: Dict):
+        """Queue an event for every subscriber; one that falls behind gets a full snapshot instead."""
+        for q in self._subscribers:
+            if q.full():
+                while not q.empty():
+                    q.get_nowait()
+                q.put_nowait(dict(event, event='snapshot', robots=self._robots_view))
+            else:
+                q.put_nowait(event)
+
+    def _snapshot(self) -> List[Dict]:
+        """Build a robot snapshot; only call from the worker thread or before serving."""
+        return [{'id': r.id, 'pos': list(r.pos), 'state': r.state} for r in self.robots]
+
+    def stats(self) -> Dict:
+        return {
+            'tick': self.tick,
+            'overruns': self.overruns,
+            'pending': len(self._pending),
+            'unassigned': self._unassigned,
+            'completed_tasks': self.completed_tasks,
+            'submit_to_assign': self.submit_to_assign.summary(),
+            'tick_compute': self.tick_compute.summary()
+        }
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        stream_task = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                    op = msg['op']
+                except (ValueError, KeyError, TypeError):
+                    await self._send(writer, {'ok': False, 'error': 'expected JSON object with "op"'})
+                    continue
+                if op in ('submit', 'order'):
+                    fut = asyncio.get_running_loop().create_future()
+                    fut.add_done_callback(lambda f, w=writer: self._write(w, f.result()))
+                    self._pending.append((dict(msg, submitted_at=time.perf_counter()), fut))
+                elif op == 'subscribe':
+                    if stream_task is None:
+                        queue = asyncio.Queue(maxsize=256)
+                        self._subscribers.append(queue)
+                        stream_task = asyncio.create_task(self._stream(queue, writer))
+                    await self._send(writer, {'ok': True, 'robots': self._robots_view})
+                elif op == 'stats':
+                    await self._send(writer, dict(self.stats(), ok=True))
+                else:
+                    await self._send(writer, {'ok': False, 'error': f'unknown op {op!r}'})
+        except ConnectionError:
+            pass
+        finally:
+            if stream_task is not None:
+                stream_task.cancel()
+                self._subscribers = [q for q in self._subscribers if q is not queue]
+            writer.close()
+
+    async def _stream(self, queue: asyncio.Queue, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                event = await queue.get()
+                await self._send(writer, event)
+        except ConnectionError:
+            # Subscriber went away; stop queueing events for it.
+            self._subscribers = [q for q in self._subscribers if q is not queue]
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, payload: Dict):
+        if not writer.is_closing():
+            writer.write((json.dumps(payload) + '\n').encode())
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, payload: Dict):
+        FleetServer._write(writer, payload)
+        await writer.drain()
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Run the warehouse simulation as a live fleet control server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--width', type=int, default=18)
+    parser.add_argument('--height', type=int, default=15)
+    parser.add_argument('--robots', type=int, default=5)
+    parser.add_argument('--algo', choices=['fifo', 'nearest'], default='nearest')
+    parser.add_argument('--rate', type=float, default=10.0, help='ticks per second, 0 for as fast as possible')
+    parser.add_argument('--congestion', action='store_true')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    server = FleetServer(width=args.width, height=args.height, nrobots=args.robots, algo=args.algo,
+                         seed=args.seed, tick_rate=args.rate, congestion=args.congestion,
+                         host=args.host, port=args.port)
+    print(f"Fleet server on {args.host}:{args.port} ({args.rate or 'max'} ticks/s)")
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
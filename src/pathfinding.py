@@ -1,5 +1,6 @@
 import heapq
-from typing import Tuple, List, Dict, Optional
+from collections import deque
+from typing import Tuple, List, Dict, Optional, Iterable, Callable
 
 Position = Tuple[int, int]
 
@@ -15,13 +16,18 @@ def neighbors(pos: Position, width: int, height: int, obstacles: List[Position]
             result.append((nx, ny))
     return result
 
-def a_star(start: Position, goal: Position, width: int, height: int, obstacles: List[Position] = []) -> List[Position]:
+def a_star(start: Position, goal: Position, width: int, height: int, obstacles: List[Position] = [],
+           edge_cost: Optional[Callable[[Position], float]] = None) -> List[Position]:
+    """
+    edge_cost, if given, adds a non-negative penalty for entering a cell (e.g. TrafficMap.cost)
+    on top of the unit step cost, which keeps the Manhattan heuristic admissible.
+    """
     if start == goal:
         return []
     frontier = []
     heapq.heappush(frontier, (0, start))
     came_from: Dict[Position, Optional[Position]] = {start: None}
-    cost_so_far: Dict[Position, int] = {start: 0}
+    cost_so_far: Dict[Position, float] = {start: 0}
 
 
     while frontier:
@@ -30,6 +36,8 @@ def a_star(start: Position, goal: Position, width: int, height: int, obstacles:
             break
         for n in neighbors(current, width, height, obstacles):
             new_cost = cost_so_far[current] + 1
+            if edge_cost is not None:
+                new_cost += edge_cost(n)
             if n not in cost_so_far or new_cost < cost_so_far[n]:
                 cost_so_far[n] = new_cost
                 priority = new_cost + heuristic(n, goal)
@@ -37,10 +45,79 @@ def a_star(start: Position, goal: Position, width: int, height: int, obstacles:
                 came_from[n] = current
     if goal not in came_from:
         return []
+    return reconstruct_path(came_from, start, goal)
+
+def reconstruct_path(came_from: Dict[Position, Optional[Position]], start: Position, goal: Position) -> List[Position]:
     path = []
     cur = goal
     while cur != start:
         path.append(cur)
         cur = came_from[cur]
     path.reverse()
-    return path
\ No newline at end of file
+    return path
+
+def nearest_targets(start: Position, targets: Iterable[Position], width: int, height: int,
+                    obstacles: List[Position] = [], k: int = 1) -> Tuple[Dict[Position, int], Dict[Position, Optional[Position]]]:
+    """
+    Breadth-first search from start that stops once the k nearest targets are reached.
+    Returns the grid distance to each reached target and the search tree, so the path
+    to any of them can be rebuilt with reconstruct_path without a separate A* call.
+    Targets may sit on obstacle cells (e.g. shelves); those are entered but not expanded.
+    """
+    found, came_from = multi_source_nearest([start], targets, width, height, obstacles, k)
+    return found[start], came_from
+
+def multi_source_nearest(sources: List[Position], targets: Iterable[Position], width: int, height: int,
+                         obstacles: List[Position] = [], k: int = 1) -> Tuple[Dict[Position, Dict[Position, int]], Dict[Position, Optional[Position]]]:
+    """
+    Batched breadth-first search grown from all sources at once on a shared frontier.
+    Each cell is claimed by the source that reaches it first, so every target ends up
+    with its nearest source. The search stops when all targets are claimed or every
+    source has k targets. Returns the targets and distances per source, plus a search
+    forest in which following came_from from any reached cell leads back to its source.
+    """
+    target_set = set(targets)
+    blocked = set(obstacles)
+    found: Dict[Position, Dict[Position, int]] = {s: {} for s in sources}
+    came_from: Dict[Position, Optional[Position]] = {}
+    owner: Dict[Position, Position] = {}
+    dist: Dict[Position, int] = {}
+    frontier = deque()
+    for s in sources:
+        if s in came_from:
+            continue
+        came_from[s] = None
+        owner[s] = s
+        dist[s] = 0
+        frontier.append(s)
+    remaining = len(target_set)
+    open_sources = len(found)
+    for s in found:
+        if s in target_set:
+            found[s][s] = 0
+            remaining -= 1
+            if len(found[s]) >= k:
+                open_sources -= 1
+    while frontier and remaining > 0 and open_sources > 0:
+        current = frontier.popleft()
+        src = owner[current]
+        if current in blocked and current != src:
+            continue
+        x, y = current
+        for n in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if n in came_from or not (0 <= n[0] < width and 0 <= n[1] < height):
+                continue
+            is_target = n in target_set
+            if n in blocked and not is_target:
+                continue
+            came_from[n] = current
+            owner[n] = src
+            dist[n] = dist[current] + 1
+            if is_target:
+                remaining -= 1
+                if len(found[src]) < k:
+                    found[src][n] = dist[n]
+                    if len(found[src]) == k:
+                        open_sources -= 1
+            frontier.append(n)
+    return found, came_from
\ No newline at end of file
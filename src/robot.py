@@ -13,11 +13,15 @@ class Robot:
     path_to_dropoff: List[Position] = field(default_factory=list)
     state: str = "idle"
     active_steps: int = 0
+    wait_steps: int = 0
+    completed_tasks: int = 0
 
     def step(self, occupied_next_positions: set):
         """
         Move robot along path respecting occupied positions.
         Lower-priority robots wait if their next cell is blocked.
+        Reaching the end of the pickup path switches to the dropoff leg, and reaching
+        the end of the dropoff path completes the task.
         """
         current_path = None
         if self.state == 'to_pickup':
@@ -28,9 +32,25 @@ class Robot:
             next_pos = current_path.pop(0)
             self.pos = next_pos
             self.active_steps += 1
+            if not current_path:
+                self._finish_leg()
             return next_pos
+        if current_path:
+            self.wait_steps += 1
         return self.pos
 
+    def _finish_leg(self):
+        if self.state == 'to_pickup' and self.path_to_dropoff:
+            self.state = 'to_dropoff'
+            return
+        self._complete()
+
+    def _complete(self):
+        # Allocators only hand out an empty dropoff path when pickup == dropoff.
+        self.state = 'idle'
+        self.carrying_task = None
+        self.completed_tasks += 1
+
     def assign_task(self, task: Task, path_to_pickup: List[Position], path_to_dropoff: List[Position]):
         self.carrying_task = task.id
         self.path_to_pickup = path_to_pickup
@@ -40,4 +60,4 @@ class Robot:
         elif path_to_dropoff:
             self.state = 'to_dropoff'
         else:
-            self.state = 'idle'
+            self._complete()
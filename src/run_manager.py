@@ -7,6 +7,7 @@ from warehouse import Warehouse
 from robot import Robot
 from scheduler import fifo_allocate, nearest_allocate
 from pathfinding import a_star
+from traffic import TrafficMap
 import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle
 from matplotlib.animation import FuncAnimation
@@ -15,7 +16,8 @@ Position = Tuple[int, int]
 
 class RunManager:
     def __init__(self, width: int = 8, height: int = 6, nrobots: int = 2,
-                 ntasks: int = 6, steps: int = 200, algo: str = 'fifo', seed: int = 42):
+                 ntasks: int = 6, steps: int = 200, algo: str = 'fifo', seed: int = 42,
+                 congestion: bool = False):
         self.width = width
         self.height = height
         self.nrobots = nrobots
@@ -23,6 +25,7 @@ class RunManager:
         self.steps = steps
         self.algo = algo
         self.seed = seed
+        self.congestion = congestion
 
     def _init_warehouse(self, seed_override=None):
         """Initialize warehouse with shelves and randomized pickup but fixed dropoff."""
@@ -46,17 +49,7 @@ class RunManager:
 
     def _init_robots(self, warehouse: Warehouse):
         """Spawn robots at random, non-shelf positions."""
-        shelf_positions = {s.pos for s in warehouse.shelves.values()}
-        robots = []
-        occupied = set(shelf_positions)
-        for i in range(self.nrobots):
-            while True:
-                pos = (random.randint(0, self.width - 1), random.randint(0, self.height - 1))
-                if pos not in occupied:
-                    robots.append(Robot(id=i + 1, pos=pos))
-                    occupied.add(pos)
-                    break
-        return robots
+        return warehouse.place_random_robots(self.nrobots)
 
     def run_single(self, run_id: int = 1) -> Tuple[str, str]:
         # Unique seed per run for varied simulations
@@ -66,12 +59,17 @@ class RunManager:
         alloc = fifo_allocate if self.algo == 'fifo' else nearest_allocate
         rows = []
         robot_utilization = {r.id: 0 for r in robots}
+        traffic = TrafficMap(self.width, self.height) if self.congestion else None
         start_time = time.time()
         for t in range(self.steps):
-            assigned = alloc(warehouse, robots, self.width, self.height)
+            assigned = alloc(warehouse, robots, self.width, self.height, traffic)
             reserved_positions = set()
+            moves = []
             for r in sorted(robots, key=lambda r: r.id):
+                prev_pos = r.pos
                 r.step(occupied_next_positions=reserved_positions)
+                if r.pos != prev_pos:
+                    moves.append(r.pos)
                 if r.state in ('to_pickup', 'to_dropoff') and r.pos:
                     reserved_positions.add(r.pos)
                 if r.state != 'idle':
@@ -83,6 +81,8 @@ class RunManager:
                     'state': r.state,
                     'carrying_task': r.carrying_task
                 })
+            if traffic is not None:
+                traffic.update([r.pos for r in robots if r.state != 'idle'], moves)
             if not warehouse.tasks and all(r.state == 'idle' for r in robots):
                 break
         duration = time.time() - start_time
@@ -93,13 +93,20 @@ class RunManager:
             writer.writeheader()
             writer.writerows(rows)
         json_file = f'run_{run_id:03d}_summary.json'
+        completed_tasks = sum(r.completed_tasks for r in robots)
+        wait_steps = {r.id: r.wait_steps for r in robots}
         summary = {
             'run_id': run_id,
             'steps': t + 1,
             'duration_s': duration_rounded,
             'nrobots': self.nrobots,
             'ntasks': self.ntasks,
-            'robot_utilization': robot_utilization
+            'robot_utilization': robot_utilization,
+            'congestion': self.congestion,
+            'completed_tasks': completed_tasks,
+            'throughput': round(completed_tasks / (t + 1), 5),
+            'wait_steps': wait_steps,
+            'mean_wait_steps': round(sum(wait_steps.values()) / len(robots), 3) if robots else 0.0
         }
         with open(json_file, 'w') as f:
             json.dump(summary, f, indent=2)
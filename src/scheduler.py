@@ -1,13 +1,38 @@
-from typing import List
+from typing import List, Dict, Tuple, Optional
 from robot import Robot
 from warehouse import Warehouse
-from pathfinding import a_star
-import math
+from task import Task
+from traffic import TrafficMap
+from pathfinding import a_star, multi_source_nearest, nearest_targets, reconstruct_path
 
-def fifo_allocate(warehouse: Warehouse, robots: List[Robot], width: int, height: int):
+Position = Tuple[int, int]
+
+def _plan_dropoff(task: Task, width: int, height: int, shelf_positions: List[Position],
+                  edge_cost, cache: Dict[Tuple[Position, Position], Optional[List[Position]]]) -> Optional[List[Position]]:
+    """
+    Path from pickup to dropoff, or None if the dropoff cannot be reached.
+    Planned against shelves only: reservations only constrain a robot's first step,
+    which is on the pickup leg. Results are cached per (pickup, dropoff) within a call.
+    """
+    key = (task.pickup, task.dropoff)
+    if key not in cache:
+        p2 = a_star(task.pickup, task.dropoff, width, height, shelf_positions, edge_cost)
+        cache[key] = p2 if p2 or task.pickup == task.dropoff else None
+    p2 = cache[key]
+    return list(p2) if p2 is not None else None
+
+
+def fifo_allocate(warehouse: Warehouse, robots: List[Robot], width: int, height: int,
+                  traffic: Optional[TrafficMap] = None):
+    """
+    Assign each idle robot the oldest queued task it can complete. Tasks whose pickup or
+    dropoff is currently unreachable stay queued and are skipped, not waited on.
+    """
     assigned = []
+    edge_cost = traffic.cost if traffic is not None else None
     shelf_positions = [s.pos for s in warehouse.shelves.values()]
     next_positions = set()
+    dropoff_paths = {}
 
     for robot in sorted(robots, key=lambda r: r.id):
         if robot.state != 'idle':
@@ -19,27 +44,44 @@ def fifo_allocate(warehouse: Warehouse, robots: List[Robot], width: int, height:
         unassigned = warehouse.list_unassigned()
         if not unassigned:
             break
-        task = unassigned[0]
-        warehouse.tasks.remove(task)
-        task.status = 'assigned'
-        obstacles = shelf_positions + list(next_positions)
-        p1 = a_star(robot.pos, task.pickup, width, height, obstacles)
-        p2 = a_star(task.pickup, task.dropoff, width, height, obstacles)
-        if p2 is None:
-            continue
-        robot.assign_task(task, p1, p2)
-        assigned.append((robot.id, task.id))
-        if p1:
-            next_positions.add(p1[0])
-        elif p2:
-            next_positions.add(p2[0])
+        for task in unassigned:
+            p2 = _plan_dropoff(task, width, height, shelf_positions, edge_cost, dropoff_paths)
+            if p2 is None:
+                continue
+            # The pickup is usually a shelf; leave it out of the obstacles so the robot can reach it.
+            obstacles = [p for p in shelf_positions if p != task.pickup] + list(next_positions)
+            p1 = a_star(robot.pos, task.pickup, width, height, obstacles, edge_cost)
+            if not p1 and robot.pos != task.pickup:
+                continue
+            warehouse.tasks.remove(task)
+            task.status = 'assigned'
+            robot.assign_task(task, p1, p2)
+            assigned.append((robot.id, task.id))
+            if p1:
+                next_positions.add(p1[0])
+            elif p2:
+                next_positions.add(p2[0])
+            break
     return assigned
 
 
-def nearest_allocate(warehouse: Warehouse, robots: List[Robot], width: int, height: int):
+def nearest_allocate(warehouse: Warehouse, robots: List[Robot], width: int, height: int,
+                     traffic: Optional[TrafficMap] = None, k: int = 3):
+    """
+    Assign each idle robot the unassigned task whose pickup is nearest by grid distance.
+    One batched search grown from every idle robot ranks pickups and yields the path to
+    them; robots whose share of the frontier holds no completable task fall back to their
+    own search over the tasks that are left. A pickup path whose first step was reserved
+    by a robot assigned earlier in the same call is re-planned around it. Tasks whose
+    dropoff is unreachable are skipped in favour of the next candidate. The traffic map,
+    if given, only weights the leg to the dropoff; pickups are ranked by grid distance.
+    """
     assigned = []
+    edge_cost = traffic.cost if traffic is not None else None
     shelf_positions = [s.pos for s in warehouse.shelves.values()]
     next_positions = set()
+    dropoff_paths = {}
+    idle = []
     for robot in sorted(robots, key=lambda r: r.id):
         if robot.state != 'idle':
             if robot.state == 'to_pickup' and robot.path_to_pickup:
@@ -47,30 +89,53 @@ def nearest_allocate(warehouse: Warehouse, robots: List[Robot], width: int, heig
             elif robot.state == 'to_dropoff' and robot.path_to_dropoff:
                 next_positions.add(robot.path_to_dropoff[0])
             continue
-        tasks = warehouse.list_unassigned()
-        if not tasks:
+        idle.append(robot)
+    tasks = [t for t in warehouse.list_unassigned() if t.pickup is not None]
+    if not idle or not tasks:
+        return assigned
+    tasks_at: Dict[Position, List[Task]] = {}
+    for t in tasks:
+        tasks_at.setdefault(t.pickup, []).append(t)
+
+    def pick(candidates: Dict[Position, int]) -> Optional[Task]:
+        """Nearest candidate pickup holding a task whose dropoff is reachable; drops dead tasks."""
+        for p in sorted((p for p in candidates if p in tasks_at), key=candidates.get):
+            for t in list(tasks_at[p]):
+                tasks_at[p].remove(t)
+                if _plan_dropoff(t, width, height, shelf_positions, edge_cost, dropoff_paths) is not None:
+                    if not tasks_at[p]:
+                        del tasks_at[p]
+                    return t
+            del tasks_at[p]
+        return None
+
+    obstacles = shelf_positions + list(next_positions)
+    found, came_from = multi_source_nearest([r.pos for r in idle], tasks_at.keys(), width, height, obstacles, k)
+    for robot in idle:
+        if not tasks_at:
+            break
+        tree = came_from
+        best_task = pick(found.get(robot.pos, {}))
+        if best_task is None and tasks_at:
+            candidates, tree = nearest_targets(robot.pos, tasks_at.keys(), width, height,
+                                               shelf_positions + list(next_positions), k=len(tasks_at))
+            best_task = pick(candidates)
+        if best_task is None:
             continue
-        best_task = None
-        best_dist = math.inf
-        for t in tasks:
-            if t.pickup is None:
-                continue
-            d = abs(robot.pos[0] - t.pickup[0]) + abs(robot.pos[1] - t.pickup[1])
-            if d < best_dist:
-                best_dist = d
-                best_task = t
-        if best_task:
-            warehouse.tasks.remove(best_task)
-            best_task.status = 'assigned'
-            obstacles = shelf_positions + list(next_positions)
-            p1 = a_star(robot.pos, best_task.pickup, width, height, obstacles)
-            p2 = a_star(best_task.pickup, best_task.dropoff, width, height, obstacles)
-            if p2 is None:
-                continue
-            robot.assign_task(best_task, p1, p2)
-            assigned.append((robot.id, best_task.id))
-            if p1:
-                next_positions.add(p1[0])
-            elif p2:
-                next_positions.add(p2[0])
+        p1 = reconstruct_path(tree, robot.pos, best_task.pickup)
+        if p1 and p1[0] in next_positions:
+            # The shared tree predates reservations made earlier in this call; re-plan around them.
+            reached, tree = nearest_targets(robot.pos, [best_task.pickup], width, height,
+                                            shelf_positions + list(next_positions), k=1)
+            if best_task.pickup in reached:
+                p1 = reconstruct_path(tree, robot.pos, best_task.pickup)
+        p2 = _plan_dropoff(best_task, width, height, shelf_positions, edge_cost, dropoff_paths)
+        warehouse.tasks.remove(best_task)
+        best_task.status = 'assigned'
+        robot.assign_task(best_task, p1, p2)
+        assigned.append((robot.id, best_task.id))
+        if p1:
+            next_positions.add(p1[0])
+        elif p2:
+            next_positions.add(p2[0])
     return assigned
@@ -0,0 +1,32 @@
+from typing import Tuple, Iterable
+import numpy as np
+
+Position = Tuple[int, int]
+
+class TrafficMap:
+    """
+    Exponentially decayed occupancy and flow statistics per grid cell.
+    Updated in place once per tick from robot positions and moves, and read by the
+    planners as a non-negative additive edge cost, so the Manhattan heuristic stays admissible.
+    """
+    def __init__(self, width: int, height: int, decay: float = 0.9, weight: float = 2.0):
+        self.width = width
+        self.height = height
+        self.decay = decay
+        self.weight = weight
+        self.occupancy = np.zeros((width, height))
+        self.flow = np.zeros((width, height))
+
+    def update(self, positions: Iterable[Position], moves: Iterable[Position]):
+        """Decay both layers and add this tick's occupied cells and entered cells."""
+        gain = 1.0 - self.decay
+        self.occupancy *= self.decay
+        self.flow *= self.decay
+        for x, y in positions:
+            self.occupancy[x, y] += gain
+        for x, y in moves:
+            self.flow[x, y] += gain
+
+    def cost(self, pos: Position) -> float:
+        x, y = pos
+        return self.weight * (self.occupancy[x, y] + self.flow[x, y])
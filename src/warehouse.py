@@ -101,6 +101,20 @@ class Warehouse:
         for i in range(n):
             self.robots.append(Robot(i + 1, (0, i)))
 
+    def place_random_robots(self, n: int) -> List:
+        """Create n robots at random, distinct, non-shelf positions."""
+        from robot import Robot
+        occupied = {s.pos for s in self.shelves.values()}
+        robots = []
+        for i in range(n):
+            while True:
+                pos = (random.randint(0, self.width - 1), random.randint(0, self.height - 1))
+                if pos not in occupied:
+                    robots.append(Robot(id=i + 1, pos=pos))
+                    occupied.add(pos)
+                    break
+        return robots
+
     def export_data(self, filename: str):
         with open(filename, 'w', newline='') as csvfile:
             writer = csv.writer(csvfile)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Modules in src/ import each other by bare name (e.g. `from warehouse import Warehouse`).
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
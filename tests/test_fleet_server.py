@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+from fleet_server import FleetServer
+
+
+async def _with_server(client, **kwargs):
+    server = FleetServer(port=0, tick_rate=0, nrobots=4, **kwargs)
+    serving = asyncio.create_task(server.serve())
+    while server._server is None:
+        await asyncio.sleep(0)
+    try:
+        return await client(server)
+    finally:
+        server.stop()
+        await serving
+
+
+async def _request(reader, writer, payload):
+    writer.write((json.dumps(payload) + '\n').encode())
+    await writer.drain()
+    return json.loads(await asyncio.wait_for(reader.readline(), 5))
+
+
+def test_submit_subscribe_and_stats():
+    async def client(server):
+        sub_reader, sub_writer = await asyncio.open_connection('127.0.0.1', server.port)
+        snapshot = await _request(sub_reader, sub_writer, {'op': 'subscribe'})
+        assert snapshot['ok'] and len(snapshot['robots']) == 4
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        task_ids = []
+        for _ in range(3):
+            reply = await _request(reader, writer, {'op': 'submit'})
+            assert reply['ok']
+            task_ids.append(reply['task_id'])
+        assigned = set()
+        moved = False
+        while assigned != set(task_ids):
+            event = json.loads(await asyncio.wait_for(sub_reader.readline(), 5))
+            assert event['event'] in ('tick', 'snapshot')
+            assigned.update(tid for _, tid in event.get('assigned', []))
+            moved = moved or bool(event['robots'])
+        while not moved:
+            event = json.loads(await asyncio.wait_for(sub_reader.readline(), 5))
+            moved = bool(event['robots'])
+        stats = await _request(reader, writer, {'op': 'stats'})
+        assert stats['submit_to_assign']['count'] == 3
+        assert stats['tick_compute']['count'] > 0
+        assert stats['tick'] > 0
+        writer.close()
+        sub_writer.close()
+    asyncio.run(_with_server(client))
+
+
+def test_bad_input_does_not_stop_server():
+    async def client(server):
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        bad = [
+            {'op': 'submit', 'pickup': [1]},
+            {'op': 'submit', 'pickup': 'ab'},
+            {'op': 'submit', 'dropoff': [99, 0]},
+            {'op': 'order', 'items': [1]},
+            {'op': 'order', 'items': {'itemA': 'x'}},
+            {'op': 'order'},
+            {'op': 'nope'},
+        ]
+        for payload in bad:
+            reply = await _request(reader, writer, payload)
+            assert reply['ok'] is False and reply['error']
+        writer.write(b'not json\n')
+        reply = json.loads(await asyncio.wait_for(reader.readline(), 5))
+        assert reply['ok'] is False
+        reply = await _request(reader, writer, {'op': 'submit', 'pickup': [1, 1]})
+        assert reply['ok'] and reply['task_id']
+        writer.close()
+    asyncio.run(_with_server(client))
+
+
+def test_allocator_failure_keeps_ticking_without_duplicate_work(monkeypatch):
+    import fleet_server
+    original = fleet_server.nearest_allocate
+    failed = []
+
+    def flaky(*args, **kwargs):
+        if not failed:
+            failed.append(True)
+            raise RuntimeError('boom')
+        return original(*args, **kwargs)
+    monkeypatch.setattr(fleet_server, 'nearest_allocate', flaky)
+
+    async def client(server):
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        reply = await _request(reader, writer, {'op': 'submit'})
+        assert reply['ok']
+        while server.completed_tasks < 1:
+            await asyncio.sleep(0.01)
+        stats = await _request(reader, writer, {'op': 'stats'})
+        assert failed and stats['completed_tasks'] == 1 and stats['unassigned'] == 0
+        reply = await _request(reader, writer, {'op': 'submit'})
+        assert reply['ok']
+        writer.close()
+    asyncio.run(asyncio.wait_for(_with_server(client), 10))
+
+
+def test_unreachable_dropoff_is_rejected():
+    async def client(server):
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        shelf = next(iter(server.warehouse.shelves.values())).pos
+        reply = await _request(reader, writer, {'op': 'submit', 'dropoff': list(shelf)})
+        assert reply['ok'] is False and 'dropoff' in reply['error']
+        reply = await _request(reader, writer, {'op': 'order', 'items': {'itemA': 1}, 'dropoff': list(shelf)})
+        assert reply['ok'] is False
+        # Wall off a free corner cell that no robot stands in.
+        robots = {r.pos for r in server.robots}
+        corner = next(c for c in [(0, 0), (server.width - 1, 0), (0, server.height - 1)]
+                      if c not in robots and c not in {s.pos for s in server.warehouse.shelves.values()})
+        for n in ((corner[0] + 1, corner[1]), (corner[0] - 1, corner[1]),
+                  (corner[0], corner[1] + 1), (corner[0], corner[1] - 1)):
+            if 0 <= n[0] < server.width and 0 <= n[1] < server.height and n not in robots:
+                server.warehouse.add_shelf(n)
+        server._reachable = server._reachable_cells()
+        reply = await _request(reader, writer, {'op': 'submit', 'dropoff': list(corner)})
+        assert reply['ok'] is False
+        reply = await _request(reader, writer, {'op': 'submit'})
+        assert reply['ok']
+        writer.close()
+    asyncio.run(_with_server(client))
+
+
+def test_subscriber_disconnect_is_dropped():
+    async def client(server):
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        await _request(reader, writer, {'op': 'subscribe'})
+        assert len(server._subscribers) == 1
+        writer.transport.abort()
+        for _ in range(500):
+            if not server._subscribers:
+                break
+            await asyncio.sleep(0.01)
+        assert server._subscribers == []
+    asyncio.run(_with_server(client))
@@ -0,0 +1,48 @@
+from pathfinding import multi_source_nearest, nearest_targets, reconstruct_path, a_star
+
+
+def test_nearest_targets_distances_around_wall():
+    # Wall at x=1 for y=0..2 forces a detour through y=3.
+    wall = [(1, 0), (1, 1), (1, 2)]
+    found, came_from = nearest_targets((0, 0), [(2, 0), (4, 4)], 5, 5, wall, k=2)
+    assert found == {(2, 0): 8, (4, 4): 8}
+    path = reconstruct_path(came_from, (0, 0), (2, 0))
+    assert len(path) == 8
+    assert path[-1] == (2, 0)
+    assert not set(path) & set(wall)
+
+
+def test_nearest_targets_caps_at_k():
+    targets = [(1, 0), (3, 0), (5, 0)]
+    found, _ = nearest_targets((0, 0), targets, 6, 1, k=2)
+    assert found == {(1, 0): 1, (3, 0): 3}
+
+
+def test_target_on_obstacle_is_reached_but_not_expanded():
+    # (2, 0) is both a shelf and a target; (4, 0) lies behind it on a 1-wide corridor.
+    found, came_from = nearest_targets((0, 0), [(2, 0), (4, 0)], 5, 1, [(2, 0)], k=2)
+    assert found == {(2, 0): 2}
+    assert reconstruct_path(came_from, (0, 0), (2, 0)) == [(1, 0), (2, 0)]
+
+
+def test_multi_source_assigns_each_target_to_nearest_source():
+    sources = [(0, 0), (9, 0)]
+    targets = [(2, 0), (3, 0), (7, 0)]
+    found, came_from = multi_source_nearest(sources, targets, 10, 1, k=3)
+    assert found[(0, 0)] == {(2, 0): 2, (3, 0): 3}
+    assert found[(9, 0)] == {(7, 0): 2}
+    assert reconstruct_path(came_from, (9, 0), (7, 0)) == [(8, 0), (7, 0)]
+    assert reconstruct_path(came_from, (0, 0), (3, 0)) == [(1, 0), (2, 0), (3, 0)]
+
+
+def test_multi_source_k_cap_per_source():
+    found, _ = multi_source_nearest([(0, 0), (9, 0)], [(1, 0), (2, 0), (8, 0)], 10, 1, k=1)
+    assert found[(0, 0)] == {(1, 0): 1}
+    assert found[(9, 0)] == {(8, 0): 1}
+
+
+def test_paths_match_a_star_length():
+    obstacles = [(2, y) for y in range(4)] + [(5, y) for y in range(2, 7)]
+    found, came_from = nearest_targets((0, 0), [(7, 6)], 8, 7, obstacles, k=1)
+    path = reconstruct_path(came_from, (0, 0), (7, 6))
+    assert found[(7, 6)] == len(path) == len(a_star((0, 0), (7, 6), 8, 7, obstacles))
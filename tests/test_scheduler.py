@@ -0,0 +1,70 @@
+from warehouse import Warehouse
+from robot import Robot
+from scheduler import fifo_allocate, nearest_allocate
+
+
+def _run(alloc, warehouse, robots, steps):
+    for _ in range(steps):
+        alloc(warehouse, robots, warehouse.width, warehouse.height)
+        reserved = set()
+        for r in robots:
+            r.step(occupied_next_positions=reserved)
+            if r.state in ('to_pickup', 'to_dropoff'):
+                reserved.add(r.pos)
+
+
+def test_unreachable_dropoff_leaves_task_queued():
+    w = Warehouse(5, 1)
+    w.add_shelf((3, 0))
+    w.add_task(order_id=None, shelf_id=None, item=None, pickup=(2, 0), dropoff=(4, 0))
+    for alloc in (fifo_allocate, nearest_allocate):
+        robot = Robot(1, (0, 0))
+        assert alloc(w, [robot], 5, 1) == []
+        assert robot.state == 'idle'
+        assert [t.status for t in w.tasks] == ['unassigned']
+
+
+def test_completion_counted_at_end_of_dropoff_leg():
+    for alloc in (fifo_allocate, nearest_allocate):
+        w = Warehouse(5, 1)
+        w.add_task(order_id=None, shelf_id=None, item=None, pickup=(2, 0), dropoff=(4, 0))
+        robot = Robot(1, (0, 0))
+        _run(alloc, w, [robot], 2)
+        assert robot.pos == (2, 0) and robot.completed_tasks == 0
+        _run(alloc, w, [robot], 2)
+        assert robot.pos == (4, 0) and robot.completed_tasks == 1
+        assert robot.state == 'idle'
+
+
+def test_uncompletable_task_does_not_block_the_next():
+    for alloc in (fifo_allocate, nearest_allocate):
+        w = Warehouse(6, 3)
+        w.add_shelf((5, 0))
+        w.add_task(order_id=None, shelf_id=None, item=None, pickup=(1, 2), dropoff=(5, 0))
+        w.add_task(order_id=None, shelf_id=None, item=None, pickup=(3, 2), dropoff=(5, 2))
+        robot = Robot(1, (0, 0))
+        _run(alloc, w, [robot], 30)
+        assert robot.completed_tasks == 1
+        assert [(t.id, t.status) for t in w.tasks] == [(1, 'unassigned')]
+
+
+def test_fifo_robot_travels_to_shelf_pickup():
+    w = Warehouse(5, 1)
+    w.add_shelf((2, 0))
+    w.add_task(order_id=None, shelf_id=None, item=None, pickup=(2, 0), dropoff=(4, 0))
+    robot = Robot(1, (0, 0))
+    fifo_allocate(w, [robot], 5, 1)
+    assert robot.path_to_pickup == [(1, 0), (2, 0)]
+    assert robot.path_to_dropoff == [(3, 0), (4, 0)]
+
+
+def test_nearest_ranks_pickups_by_grid_distance():
+    # Task 1 is 2 cells away as the crow flies but behind a wall; task 2 is 4 cells down the aisle.
+    w = Warehouse(5, 5)
+    for y in range(4):
+        w.add_shelf((1, y))
+    w.add_task(order_id=None, shelf_id=None, item=None, pickup=(2, 0), dropoff=(4, 4))
+    w.add_task(order_id=None, shelf_id=None, item=None, pickup=(0, 4), dropoff=(4, 4))
+    robot = Robot(1, (0, 0))
+    assert nearest_allocate(w, [robot], 5, 5) == [(1, 2)]
+    assert robot.path_to_pickup == [(0, 1), (0, 2), (0, 3), (0, 4)]